@@ -0,0 +1,115 @@
+"""
+Codificadores en streaming para la exportación masiva de lanzamientos.
+
+Cada codificador recibe un iterable de páginas (listas de filas) y produce
+bloques de bytes a medida que llegan las páginas, de modo que la memoria
+del servidor depende del tamaño de página y no del total exportado.
+"""
+
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+Row = Dict[str, Any]
+Pages = Iterable[List[Row]]
+Encoder = Callable[[Pages, Sequence[str]], Iterator[bytes]]
+
+
+def _plain(value: Any) -> Any:
+    # boto3 devuelve los números de DynamoDB como Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def project(item: Row, columns: Sequence[str]) -> Row:
+    """Fila con solo las columnas exportadas, en orden y con tipos nativos."""
+    return {column: _plain(item.get(column)) for column in columns}
+
+
+def ndjson_stream(pages: Pages, columns: Sequence[str]) -> Iterator[bytes]:
+    for page in pages:
+        if not page:
+            continue
+        yield b"".join(
+            json.dumps(project(item, columns), ensure_ascii=False).encode("utf-8") + b"\n"
+            for item in page
+        )
+
+
+def csv_stream(pages: Pages, columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+
+    for page in pages:
+        for item in page:
+            writer.writerow(project(item, columns))
+        # Con FilterExpression + Limit hay páginas vacías: no emitir b""
+        chunk = buffer.getvalue()
+        if chunk:
+            yield chunk.encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    # Sin páginas, la cabecera sigue pendiente en el buffer
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino de escritura que acumula bytes hasta que se drenan."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_stream(pages: Pages, columns: Sequence[str]) -> Iterator[bytes]:
+    """Un row group por página; el footer se emite al final."""
+    # pyarrow es dependencia obligatoria; se importa aquí solo para no
+    # cargarlo en cada worker que nunca exporta Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column, pa.int64() if column == "launch_date_unix" else pa.string())
+        for column in columns
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for page in pages:
+            if not page:
+                continue
+            rows = [project(item, columns) for item in page]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# format -> (codificador, media type)
+EXPORT_FORMATS: Dict[str, Tuple[Encoder, str]] = {
+    "ndjson": (ndjson_stream, "application/x-ndjson"),
+    "csv": (csv_stream, "text/csv"),
+    "parquet": (parquet_stream, "application/vnd.apache.parquet"),
+}
+
@@ -0,0 +1,138 @@
+"""
+Caché LRU con TTL y single-flight para lookups por clave.
+
+Las peticiones concurrentes para la misma clave comparten una única
+llamada al backend (single-flight); el resultado se guarda en un LRU
+acotado, incluidos los resultados negativos (None -> 404), con TTLs
+independientes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class _Flight:
+    """Llamada en curso para una clave; los demás hilos esperan su resultado."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class LookupCache(Generic[V]):
+    """
+    LRU thread-safe con TTL para aciertos y para resultados None.
+
+    Args:
+        maxsize: número máximo de claves guardadas.
+        ttl: segundos que se guarda un resultado encontrado.
+        negative_ttl: segundos que se guarda un resultado None.
+        clock: fuente de tiempo monotónica (inyectable en tests).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        negative_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[V], float]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str, loader: Callable[[str], Optional[V]]) -> Optional[V]:
+        """
+        Devuelve el valor de `key`, llamando a `loader` solo si no está en
+        caché y no hay otra llamada en curso para la misma clave.
+
+        Los errores de `loader` se propagan a todos los que esperaban y no
+        se guardan en caché.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    if value is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return value
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader(key)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        else:
+            flight.value = value
+            self._store(key, value)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+        return value
+
+    def _store(self, key: str, value: Optional[V]) -> None:
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.negative_hits = self.misses = 0
+            self.coalesced = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
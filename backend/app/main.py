@@ -1,19 +1,51 @@
+import json
 import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from pathlib import Path
 
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
+from .lookup_cache import LookupCache
+from .export import EXPORT_FORMATS
+from .snapshot import Body, LaunchSnapshot, SnapshotData, SnapshotRefresher
+
+# Modo multi-worker: si se define, los workers sirven desde un snapshot
+# compartido (mmap) que refresca un único worker por tarea.
+SNAPSHOT_PATH = os.getenv("LAUNCH_SNAPSHOT_PATH")
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("LAUNCH_SNAPSHOT_REFRESH_SECONDS", "60"))
+
+snapshot: Optional[LaunchSnapshot] = (
+    LaunchSnapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresher = None
+    if snapshot is not None:
+        refresher = SnapshotRefresher(
+            snapshot, _build_snapshot, interval=SNAPSHOT_REFRESH_SECONDS
+        )
+        refresher.start()
+    yield
+    if refresher is not None:
+        refresher.stop()
+
+
 app = FastAPI(
     title="SpaceX Launches API",
     version="1.0.0",
     description="API para consultar lanzamientos de SpaceX desde DynamoDB",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -31,8 +63,25 @@ if STATIC_DIR.exists():
     app.mount("/assets", StaticFiles(directory=str(STATIC_DIR / "assets")), name="assets")
 
 DYNAMO_TABLE_NAME = os.getenv("LAUNCHES_TABLE_NAME", "spacex-launches-dev")
+EXPORT_PAGE_SIZE = int(os.getenv("LAUNCHES_EXPORT_PAGE_SIZE", "500"))
+# GSI disperso mantenido por el sync (change_feed + updated_seq)
+CHANGES_INDEX_NAME = os.getenv("LAUNCHES_CHANGES_INDEX", "changes-index")
+CHANGE_FEED_PARTITION = "launches"
+# Marca de agua del change feed (committed_seq) que publica el sync
+SYNC_STATE_TABLE_NAME = os.getenv("SYNC_STATE_TABLE_NAME", "spacex-sync-state-dev")
+CHANGE_SEQ_STATE_ID = "change_seq"
+# Segundos tras un commit durante los que el token no avanza (lag del GSI)
+CHANGES_GRACE_SECONDS = int(os.getenv("LAUNCHES_CHANGES_GRACE_SECONDS", "30"))
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(DYNAMO_TABLE_NAME)
+state_table = dynamodb.Table(SYNC_STATE_TABLE_NAME)
+
+# Caché de /launches/{id}: single-flight + LRU con TTL, incluidos los 404
+launch_cache: LookupCache[Dict[str, Any]] = LookupCache(
+    maxsize=int(os.getenv("LAUNCH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("LAUNCH_CACHE_TTL_SECONDS", "60")),
+    negative_ttl=float(os.getenv("LAUNCH_CACHE_NEGATIVE_TTL_SECONDS", "30")),
+)
 
 
 class Launch(BaseModel):
@@ -49,59 +98,54 @@ class Launch(BaseModel):
     video_link: Optional[str] = None
 
 
+class LaunchChanges(BaseModel):
+    token: str
+    launch_ids: List[str]
+    launches: List[Launch]
+
+
 class LaunchSummary(BaseModel):
     total: int
     by_status: Dict[str, int]
     by_year: Dict[str, int]
 
 
-@app.get("/health")
-def health_check():
-    return {"status": "ok", "table": DYNAMO_TABLE_NAME}
-
-
-@app.get("/launches", response_model=List[Launch])
-def list_launches(
-    status: Optional[str] = Query(None, description="success | failed | upcoming"),
-):
-    """
-    Lista lanzamientos. Para 205 items podemos usar scan sin problema.
-    """
+def _scan_all() -> List[Dict[str, Any]]:
+    """Scan completo de la tabla, siguiendo la paginación."""
     response = table.scan()
     items = response.get("Items", [])
-    
+
     while 'LastEvaluatedKey' in response:
         response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
         items.extend(response.get("Items", []))
 
-    if status:
-        items = [i for i in items if i.get("status") == status]
-
-    # Orden sencillo por fecha
-    items.sort(key=lambda x: x.get("launch_date_unix", 0), reverse=True)
-
     return items
 
 
-@app.get("/launches/{launch_id}", response_model=Launch)
-def get_launch(launch_id: str):
-    response = table.get_item(Key={"launch_id": launch_id})
-    item = response.get("Item")
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Launch not found")
+def _iter_scan_pages(
+    limit: int = 100,
+    status: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Recorre la tabla página a página (Limit + ExclusiveStartKey), igual que
+    list_launches en src/dynamo_repository.py, sin acumular los items.
+    """
+    scan_kwargs: Dict[str, Any] = {"Limit": limit}
+    if status:
+        scan_kwargs["FilterExpression"] = Attr("status").eq(status)
 
-    return item
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield response.get("Items", [])
 
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+        scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
-@app.get("/stats/summary", response_model=LaunchSummary)
-def stats_summary():
-    """
-    Devuelve conteos por status y por año (para gráficos).
-    """
-    response = table.scan()
-    items = response.get("Items", [])
 
+def _summarize(items: List[Dict[str, Any]]) -> LaunchSummary:
+    """Conteos por status y por año."""
     total = len(items)
     by_status: Dict[str, int] = {}
     by_year: Dict[str, int] = {}
@@ -135,6 +179,208 @@ def stats_summary():
     return LaunchSummary(total=total, by_status=by_status, by_year=by_year)
 
 
+def _json_bytes(data: Any) -> bytes:
+    # Mismo formato que JSONResponse de FastAPI
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _build_snapshot() -> SnapshotData:
+    """
+    Carga todos los lanzamientos y precalcula los cuerpos JSON que sirven
+    /launches (completo y por status), /launches/{id} y /stats/summary.
+    """
+    items = _scan_all()
+    items.sort(key=lambda x: x.get("launch_date_unix", 0), reverse=True)
+
+    launches = [Launch.model_validate(i).model_dump() for i in items]
+    by_status: Dict[str, List[Dict[str, Any]]] = {}
+    for launch in launches:
+        by_status.setdefault(launch["status"], []).append(launch)
+
+    sections = {
+        "launches": _json_bytes(launches),
+        "stats:summary": _json_bytes(_summarize(items).model_dump()),
+    }
+    for status, group in by_status.items():
+        sections[f"launches:{status}"] = _json_bytes(group)
+
+    return sections, {launch["launch_id"]: _json_bytes(launch) for launch in launches}
+
+
+def _snapshot_response(body: Optional[Body]) -> Optional[Response]:
+    # Response.render deja pasar memoryview sin copiarlo
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/health")
+def health_check():
+    return {
+        "status": "ok",
+        "table": DYNAMO_TABLE_NAME,
+        "snapshot_version": snapshot.version if snapshot is not None else None,
+    }
+
+
+@app.get("/launches", response_model=List[Launch])
+def list_launches(
+    status: Optional[str] = Query(None, description="success | failed | upcoming"),
+):
+    """
+    Lista lanzamientos. Para 205 items podemos usar scan sin problema.
+    """
+    if snapshot is not None and snapshot.loaded:
+        body = snapshot.section(f"launches:{status}" if status else "launches")
+        return _snapshot_response(body if body is not None else b"[]")
+
+    items = _scan_all()
+
+    if status:
+        items = [i for i in items if i.get("status") == status]
+
+    # Orden sencillo por fecha
+    items.sort(key=lambda x: x.get("launch_date_unix", 0), reverse=True)
+
+    return items
+
+
+@app.get("/launches/changes", response_model=LaunchChanges)
+def launch_changes(
+    since: Optional[str] = Query(None, description="Token devuelto por la consulta anterior"),
+):
+    """
+    Devuelve solo los lanzamientos añadidos/modificados desde `since`,
+    junto con un nuevo token para la siguiente consulta.
+    Sin `since` devuelve todos los lanzamientos del change feed.
+
+    Solo se sirven secuencias hasta committed_seq (bloques de sync ya
+    completos) y el token es esa marca, no el máximo visto: el GSI se
+    replica de forma asíncrona y sin orden entre items. Durante
+    CHANGES_GRACE_SECONDS tras un commit el token no avanza, así que los
+    clientes pueden recibir de nuevo algunos items (deduplican por
+    launch_id) pero no se pierden los que aún no llegaron al índice.
+    """
+    try:
+        since_seq = int(since) if since else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+    if since_seq < 0:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+
+    state = state_table.get_item(
+        Key={"state_id": CHANGE_SEQ_STATE_ID}, ConsistentRead=True
+    ).get("Item", {})
+    committed_seq = int(state.get("committed_seq", 0))
+    committed_at = int(state.get("committed_at", 0))
+
+    # Token posterior a la marca (p.ej. de una versión anterior): se rebobina
+    since_seq = min(since_seq, committed_seq)
+
+    items: List[Dict[str, Any]] = []
+    if committed_seq > since_seq:
+        query_kwargs: Dict[str, Any] = {
+            "IndexName": CHANGES_INDEX_NAME,
+            "KeyConditionExpression": (
+                Key("change_feed").eq(CHANGE_FEED_PARTITION)
+                & Key("updated_seq").between(since_seq + 1, committed_seq)
+            ),
+        }
+        response = table.query(**query_kwargs)
+        items = response.get("Items", [])
+
+        while "LastEvaluatedKey" in response:
+            response = table.query(
+                ExclusiveStartKey=response["LastEvaluatedKey"], **query_kwargs
+            )
+            items.extend(response.get("Items", []))
+
+        items = [i for i in items if int(i["updated_seq"]) <= committed_seq]
+
+    in_grace = time.time() - committed_at < CHANGES_GRACE_SECONDS
+    token = since_seq if in_grace else committed_seq
+
+    return LaunchChanges(
+        token=str(token),
+        launch_ids=[i["launch_id"] for i in items],
+        launches=items,
+    )
+
+
+@app.get("/launches/export")
+def export_launches(
+    fmt: str = Query("ndjson", alias="format", description="ndjson | csv | parquet"),
+    status: Optional[str] = Query(None, description="success | failed | upcoming"),
+):
+    """
+    Exporta todos los lanzamientos en streaming, página a página desde
+    DynamoDB, sin construir la lista completa en memoria.
+
+    El status 200 y las cabeceras se envían con el primer bloque: si
+    DynamoDB falla a mitad del scan, la respuesta se corta sin más. Un
+    export NDJSON/CSV truncado sigue siendo legible, así que el cliente
+    no puede distinguirlo de uno completo. Un Parquet truncado no tiene
+    footer y falla al leerse.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+
+    encoder, media_type = EXPORT_FORMATS[fmt]
+    columns = list(Launch.model_fields)
+    pages = _iter_scan_pages(limit=EXPORT_PAGE_SIZE, status=status)
+
+    return StreamingResponse(
+        encoder(pages, columns),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="launches.{fmt}"'},
+    )
+
+
+def _load_launch(launch_id: str) -> Optional[Dict[str, Any]]:
+    response = table.get_item(Key={"launch_id": launch_id})
+    return response.get("Item")
+
+
+@app.get("/launches/{launch_id}", response_model=Launch)
+def get_launch(launch_id: str):
+    if snapshot is not None:
+        cached = _snapshot_response(snapshot.launch(launch_id))
+        if cached is not None:
+            return cached
+
+    item = launch_cache.get(launch_id, _load_launch)
+
+    if not item:
+        raise HTTPException(status_code=404, detail="Launch not found")
+
+    return item
+
+
+@app.get("/stats/summary", response_model=LaunchSummary)
+def stats_summary():
+    """
+    Devuelve conteos por status y por año (para gráficos).
+    """
+    if snapshot is not None:
+        cached = _snapshot_response(snapshot.section("stats:summary"))
+        if cached is not None:
+            return cached
+
+    response = table.scan()
+    items = response.get("Items", [])
+
+    return _summarize(items)
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    """
+    Contadores de la caché de lanzamientos individuales (hits, misses,
+    hits negativos, peticiones coalescidas y expulsiones).
+    """
+    return {"launch_lookup": launch_cache.stats()}
+
+
 # Servir el frontend en la raíz (debe ir al final)
 @app.get("/{full_path:path}")
 async def serve_frontend(full_path: str):
@@ -0,0 +1,245 @@
+"""
+Snapshot de lanzamientos compartido entre procesos worker.
+
+Un único worker por tarea (el que obtiene el lock) carga los lanzamientos
+desde DynamoDB y escribe un archivo de snapshot; todos los workers lo leen
+vía mmap, de modo que las páginas se comparten entre procesos y la memoria
+no crece con el número de workers.
+
+Formato del archivo:
+    MAGIC (8 bytes) | version (u64) | index_len (u32) | index JSON | payload
+
+El índice JSON mapea nombres de sección y launch_id a (offset, length)
+dentro del payload, que contiene los cuerpos JSON ya serializados.
+
+Las nuevas versiones se escriben en un archivo temporal y se publican con
+os.replace(), así que los lectores siempre ven una versión completa.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPXSNAP1"
+_HEADER = struct.Struct("<8sQI")
+
+# (sections, launches): cuerpos JSON por nombre de sección y por launch_id
+SnapshotData = Tuple[Dict[str, bytes], Dict[str, bytes]]
+# Cuerpo servido: memoryview sobre el mmap, o bytes en los fallbacks
+Body = Union[bytes, memoryview]
+
+
+def _digest(sections: Dict[str, bytes], launches: Dict[str, bytes]) -> str:
+    h = hashlib.sha1()
+    for mapping in (sections, launches):
+        for key in sorted(mapping):
+            h.update(key.encode("utf-8"))
+            h.update(mapping[key])
+    return h.hexdigest()
+
+
+def write_snapshot(
+    path: str,
+    version: int,
+    sections: Dict[str, bytes],
+    launches: Dict[str, bytes],
+) -> None:
+    """Escribe el snapshot de forma atómica (archivo temporal + os.replace)."""
+    payload = bytearray()
+    index: Dict[str, object] = {
+        "digest": _digest(sections, launches),
+        "sections": {},
+        "launches": {},
+    }
+    for kind, mapping in (("sections", sections), ("launches", launches)):
+        for key, body in mapping.items():
+            index[kind][key] = (len(payload), len(body))  # type: ignore[index]
+            payload += body
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, version, len(index_bytes)))
+        fh.write(index_bytes)
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+class _View:
+    """Vista de solo lectura sobre una versión concreta del snapshot."""
+
+    def __init__(self, fh) -> None:
+        self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, index_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError("Invalid launch snapshot file")
+        start = _HEADER.size
+        index = json.loads(self._mm[start:start + index_len])
+        self.digest: str = index["digest"]
+        self._base = start + index_len
+        self._sections: Dict[str, list] = index["sections"]
+        self._launches: Dict[str, list] = index["launches"]
+
+    def _read(self, entry: Optional[list]) -> Optional[memoryview]:
+        # Sin copia: la vista apunta a las páginas compartidas del mmap y
+        # lo mantiene vivo aunque se publique una versión nueva.
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._base + offset
+        return memoryview(self._mm)[start:start + length]
+
+    def section(self, name: str) -> Optional[memoryview]:
+        return self._read(self._sections.get(name))
+
+    def launch(self, launch_id: str) -> Optional[memoryview]:
+        return self._read(self._launches.get(launch_id))
+
+
+class LaunchSnapshot:
+    """
+    Lector del snapshot compartido.
+
+    Comprueba como mucho cada `check_interval` segundos si hay una versión
+    nueva (cambio de inodo tras os.replace) y cambia de vista atómicamente.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._view: Optional[_View] = None
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+
+    def _current(self) -> Optional[_View]:
+        # También sin vista cargada: un archivo ausente (arranque, o build
+        # fallando) se prueba como mucho una vez por intervalo
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._view
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                with open(self.path, "rb") as fh:
+                    st = os.fstat(fh.fileno())
+                    stat_key = (st.st_ino, st.st_mtime_ns)
+                    if stat_key != self._stat_key:
+                        # La vista anterior (y su mmap) se libera cuando ya
+                        # no quedan respuestas usando sus memoryviews
+                        self._view = _View(fh)
+                        self._stat_key = stat_key
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError):
+                logger.exception("Could not load launch snapshot %s", self.path)
+        return self._view
+
+    @property
+    def version(self) -> int:
+        view = self._current()
+        return view.version if view else 0
+
+    @property
+    def digest(self) -> Optional[str]:
+        view = self._current()
+        return view.digest if view else None
+
+    def section(self, name: str) -> Optional[memoryview]:
+        view = self._current()
+        return view.section(name) if view else None
+
+    def launch(self, launch_id: str) -> Optional[memoryview]:
+        view = self._current()
+        return view.launch(launch_id) if view else None
+
+    @property
+    def loaded(self) -> bool:
+        return self._current() is not None
+
+
+class SnapshotRefresher:
+    """
+    Hilo en segundo plano que refresca el snapshot.
+
+    Todos los workers lo arrancan, pero solo el que obtiene el lock
+    exclusivo (flock) sobre `<path>.lock` consulta DynamoDB; si ese worker
+    muere, el lock se libera y otro toma el relevo.
+    """
+
+    def __init__(
+        self,
+        snapshot: LaunchSnapshot,
+        build: Callable[[], SnapshotData],
+        interval: float = 60.0,
+    ) -> None:
+        self.snapshot = snapshot
+        self.build = build
+        self.interval = interval
+        self.is_leader = False
+        self._lock_fh = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        fh = open(f"{self.snapshot.path}.lock", "a+")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._lock_fh = fh
+        self.is_leader = True
+        logger.info("Worker %d is the launch snapshot refresher", os.getpid())
+        return True
+
+    def refresh_once(self) -> bool:
+        """Reconstruye el snapshot si este worker es el líder. True si escribió."""
+        if not self._try_acquire():
+            return False
+
+        sections, launches = self.build()
+        if _digest(sections, launches) == self.snapshot.digest:
+            return False
+
+        version = self.snapshot.version + 1
+        write_snapshot(self.snapshot.path, version, sections, launches)
+        logger.info("Published launch snapshot version %d", version)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception:
+                logger.exception("Launch snapshot refresh failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="launch-snapshot-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._lock_fh is not None:
+            self._lock_fh.close()
+            self._lock_fh = None
+            self.is_leader = False
@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.lookup_cache import LookupCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hits_and_ttl_expiry():
+    clock = FakeClock()
+    cache = LookupCache(ttl=10, negative_ttl=5, clock=clock)
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return None if key == "missing" else {"launch_id": key}
+
+    assert cache.get("1", loader) == {"launch_id": "1"}
+    assert cache.get("1", loader) == {"launch_id": "1"}
+    assert cache.get("missing", loader) is None
+    assert cache.get("missing", loader) is None
+    assert calls == ["1", "missing"]
+
+    # El resultado negativo caduca antes que el positivo
+    clock.now = 6
+    cache.get("missing", loader)
+    cache.get("1", loader)
+    assert calls == ["1", "missing", "missing"]
+
+    clock.now = 11
+    cache.get("1", loader)
+    assert calls == ["1", "missing", "missing", "1"]
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["negative_hits"] == 1
+    assert stats["misses"] == 4
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LookupCache(maxsize=2)
+    loader = lambda key: {"launch_id": key}  # noqa: E731
+
+    cache.get("a", loader)
+    cache.get("b", loader)
+    cache.get("a", loader)  # "a" pasa a ser el más reciente
+    cache.get("c", loader)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+    misses = cache.stats()["misses"]
+    cache.get("a", loader)
+    assert cache.stats()["misses"] == misses
+    cache.get("b", loader)
+    assert cache.stats()["misses"] == misses + 1
+
+
+def test_concurrent_lookups_share_one_call():
+    cache = LookupCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        started.set()
+        release.wait(timeout=5)
+        return {"launch_id": key}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(cache.get, "1", loader)
+        started.wait(timeout=5)
+        others = [pool.submit(cache.get, "1", loader) for _ in range(7)]
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        results = [first.result()] + [f.result() for f in others]
+
+    assert calls == ["1"]
+    assert all(r == {"launch_id": "1"} for r in results)
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_loader_errors_are_not_cached():
+    cache = LookupCache()
+    attempts = []
+
+    def loader(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise RuntimeError("DynamoDB unavailable")
+        return {"launch_id": key}
+
+    with pytest.raises(RuntimeError):
+        cache.get("1", loader)
+
+    assert cache.get("1", loader) == {"launch_id": "1"}
+    assert len(attempts) == 2
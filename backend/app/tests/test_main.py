@@ -1,3 +1,9 @@
+import csv
+import io
+import json
+import time
+
+import pyarrow.parquet as pq
 import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
@@ -11,6 +17,14 @@ with patch("boto3.resource") as mock_boto3:
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_launch_cache():
+    from app.main import launch_cache
+
+    launch_cache.clear()
+    yield
+
+
 def test_health():
     response = client.get("/health")
     assert response.status_code == 200
@@ -75,6 +89,36 @@ def test_get_launch_not_found(mock_table):
     assert response.json()["detail"] == "Launch not found"
 
 
+@patch("app.main.table")
+def test_get_launch_is_cached_including_not_found(mock_table):
+    mock_table.get_item.side_effect = lambda Key: (
+        {
+            "Item": {
+                "launch_id": "1",
+                "mission_name": "Test Mission",
+                "rocket_id": "rocket123",
+                "launch_date_utc": "2020-01-01T00:00:00.000Z",
+                "launch_date_unix": 1577836800,
+                "status": "success",
+            }
+        }
+        if Key["launch_id"] == "1"
+        else {}
+    )
+
+    assert client.get("/launches/1").status_code == 200
+    assert client.get("/launches/1").status_code == 200
+    assert client.get("/launches/999").status_code == 404
+    assert client.get("/launches/999").status_code == 404
+
+    assert mock_table.get_item.call_count == 2
+
+    stats = client.get("/stats/cache").json()["launch_lookup"]
+    assert stats["hits"] == 1
+    assert stats["negative_hits"] == 1
+    assert stats["misses"] == 2
+
+
 @patch("app.main.table")
 def test_stats_summary(mock_table):
     mock_table.scan.return_value = {
@@ -109,3 +153,259 @@ def test_stats_summary(mock_table):
     assert data["by_status"]["failed"] == 1
     assert data["by_year"]["2020"] == 1
     assert data["by_year"]["2021"] == 1
+
+
+@patch("app.main.state_table")
+@patch("app.main.table")
+def test_launch_changes(mock_table, mock_state_table):
+    mock_state_table.get_item.return_value = {
+        "Item": {"committed_seq": 14, "committed_at": 0}
+    }
+    mock_table.query.side_effect = [
+        {
+            "Items": [
+                {
+                    "launch_id": "1",
+                    "mission_name": "Mission 1",
+                    "rocket_id": "r1",
+                    "launch_date_utc": "2020-01-01T00:00:00.000Z",
+                    "launch_date_unix": 1577836800,
+                    "status": "success",
+                    "updated_seq": 11,
+                }
+            ],
+            "LastEvaluatedKey": {"launch_id": "1"},
+        },
+        {
+            "Items": [
+                {
+                    "launch_id": "2",
+                    "mission_name": "Mission 2",
+                    "rocket_id": "r2",
+                    "launch_date_utc": "2021-01-01T00:00:00.000Z",
+                    "launch_date_unix": 1609459200,
+                    "status": "failed",
+                    "updated_seq": 14,
+                }
+            ]
+        },
+    ]
+
+    response = client.get("/launches/changes?since=10")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token"] == "14"
+    assert data["launch_ids"] == ["1", "2"]
+    assert data["launches"][1]["mission_name"] == "Mission 2"
+    assert mock_table.query.call_count == 2
+
+
+@patch("app.main.state_table")
+@patch("app.main.table")
+def test_launch_changes_no_changes_keeps_token(mock_table, mock_state_table):
+    mock_state_table.get_item.return_value = {
+        "Item": {"committed_seq": 42, "committed_at": 0}
+    }
+
+    response = client.get("/launches/changes?since=42")
+
+    assert response.status_code == 200
+    assert response.json() == {"token": "42", "launch_ids": [], "launches": []}
+    mock_table.query.assert_not_called()
+
+
+def _change_item(launch_id, seq):
+    return {
+        "launch_id": launch_id,
+        "mission_name": f"Mission {launch_id}",
+        "rocket_id": "r1",
+        "launch_date_utc": "2020-01-01T00:00:00.000Z",
+        "launch_date_unix": 1577836800,
+        "status": "success",
+        "updated_seq": seq,
+    }
+
+
+@patch("app.main.state_table")
+@patch("app.main.table")
+def test_launch_changes_token_is_committed_mark(mock_table, mock_state_table):
+    # El índice ya muestra seq 14 (bloque sin commit), pero la marca es 12
+    mock_state_table.get_item.return_value = {
+        "Item": {"committed_seq": 12, "committed_at": 0}
+    }
+    mock_table.query.return_value = {
+        "Items": [_change_item("a", 11), _change_item("b", 14)]
+    }
+
+    response = client.get("/launches/changes?since=10")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token"] == "12"
+    assert data["launch_ids"] == ["a"]
+
+    condition = mock_table.query.call_args.kwargs["KeyConditionExpression"]
+    between = condition.get_expression()["values"][1]
+    assert between.expression_operator == "BETWEEN"
+    assert between.get_expression()["values"][1:] == (11, 12)
+
+
+@patch("app.main.state_table")
+@patch("app.main.table")
+def test_launch_changes_token_held_during_grace(mock_table, mock_state_table):
+    mock_state_table.get_item.return_value = {
+        "Item": {"committed_seq": 12, "committed_at": int(time.time())}
+    }
+    mock_table.query.return_value = {"Items": [_change_item("a", 11)]}
+
+    data = client.get("/launches/changes?since=10").json()
+
+    # Se sirven los cambios pero el token no avanza hasta pasado el margen
+    assert data["launch_ids"] == ["a"]
+    assert data["token"] == "10"
+
+
+def test_launch_changes_invalid_token():
+    response = client.get("/launches/changes?since=abc")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid change token"
+
+
+@patch("app.main.table")
+def test_endpoints_served_from_snapshot(mock_table, tmp_path):
+    from app import main
+    from app.snapshot import LaunchSnapshot, write_snapshot
+
+    mock_table.scan.return_value = {
+        "Items": [
+            {
+                "launch_id": "1",
+                "mission_name": "Mission 1",
+                "rocket_id": "r1",
+                "launch_date_utc": "2020-01-01T00:00:00.000Z",
+                "launch_date_unix": 1577836800,
+                "status": "success",
+                "content_hash": "abc",
+            },
+            {
+                "launch_id": "2",
+                "mission_name": "Mission 2",
+                "rocket_id": "r2",
+                "launch_date_utc": "2021-01-01T00:00:00.000Z",
+                "launch_date_unix": 1609459200,
+                "status": "failed",
+            },
+        ]
+    }
+    path = str(tmp_path / "launches.snapshot")
+    write_snapshot(path, 1, *main._build_snapshot())
+    mock_table.reset_mock()
+
+    with patch("app.main.snapshot", LaunchSnapshot(path)):
+        launches = client.get("/launches").json()
+        failed = client.get("/launches?status=failed").json()
+        upcoming = client.get("/launches?status=upcoming").json()
+        launch = client.get("/launches/1").json()
+        stats = client.get("/stats/summary").json()
+
+    assert [i["launch_id"] for i in launches] == ["2", "1"]
+    assert "content_hash" not in launches[0]
+    assert [i["launch_id"] for i in failed] == ["2"]
+    assert upcoming == []
+    assert launch["mission_name"] == "Mission 1"
+    assert stats["total"] == 2
+    assert stats["by_year"]["2021"] == 1
+    mock_table.scan.assert_not_called()
+    mock_table.get_item.assert_not_called()
+
+
+EXPORT_PAGES = [
+    {
+        "Items": [
+            {
+                "launch_id": "1",
+                "mission_name": "Mission 1",
+                "rocket_id": "r1",
+                "launch_date_utc": "2020-01-01T00:00:00.000Z",
+                "launch_date_unix": 1577836800,
+                "status": "success",
+                "content_hash": "abc",
+            }
+        ],
+        "LastEvaluatedKey": {"launch_id": "1"},
+    },
+    {
+        "Items": [
+            {
+                "launch_id": "2",
+                "mission_name": "Mission, 2",
+                "rocket_id": "r2",
+                "launch_date_utc": "2021-01-01T00:00:00.000Z",
+                "launch_date_unix": 1609459200,
+                "status": "failed",
+            }
+        ]
+    },
+]
+
+
+@patch("app.main.table")
+def test_export_launches_ndjson(mock_table):
+    mock_table.scan.side_effect = EXPORT_PAGES
+
+    response = client.get("/launches/export?format=ndjson")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["launch_id"] for r in rows] == ["1", "2"]
+    assert "content_hash" not in rows[0]
+    assert mock_table.scan.call_count == 2
+    assert mock_table.scan.call_args_list[1].kwargs["ExclusiveStartKey"] == {"launch_id": "1"}
+
+
+@patch("app.main.table")
+def test_export_launches_csv(mock_table):
+    mock_table.scan.side_effect = EXPORT_PAGES
+
+    response = client.get("/launches/export?format=csv")
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["launch_id"] for r in rows] == ["1", "2"]
+    assert rows[1]["mission_name"] == "Mission, 2"
+
+
+@patch("app.main.table")
+def test_export_launches_parquet(mock_table):
+    mock_table.scan.side_effect = EXPORT_PAGES
+
+    response = client.get("/launches/export?format=parquet")
+
+    assert response.status_code == 200
+    parquet_file = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.read().column("launch_id").to_pylist() == ["1", "2"]
+
+
+def test_csv_stream_skips_empty_pages():
+    from app.export import csv_stream
+
+    page = [{"launch_id": "1", "mission_name": "Mission 1"}]
+    chunks = list(csv_stream([[], page, [], []], ["launch_id", "mission_name"]))
+
+    # Cabecera en el primer bloque, sin bloques vacíos por las páginas vacías
+    assert b"" not in chunks
+    assert b"".join(chunks).decode("utf-8").splitlines() == [
+        "launch_id,mission_name",
+        "1,Mission 1",
+    ]
+
+
+def test_export_launches_invalid_format():
+    response = client.get("/launches/export?format=xml")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unsupported export format"
@@ -0,0 +1,100 @@
+import json
+
+from app.snapshot import LaunchSnapshot, SnapshotRefresher, write_snapshot
+
+
+def _data(mission_name="Mission 1"):
+    launch = {"launch_id": "1", "mission_name": mission_name}
+    sections = {"launches": json.dumps([launch]).encode("utf-8")}
+    launches = {"1": json.dumps(launch).encode("utf-8")}
+    return sections, launches
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "launches.snapshot")
+    write_snapshot(path, 3, *_data())
+
+    snapshot = LaunchSnapshot(path)
+
+    assert snapshot.loaded
+    assert snapshot.version == 3
+    body = snapshot.launch("1")
+    assert isinstance(body, memoryview)
+    assert json.loads(bytes(snapshot.section("launches")))[0]["launch_id"] == "1"
+    assert json.loads(bytes(body))["mission_name"] == "Mission 1"
+    assert snapshot.launch("missing") is None
+    assert snapshot.section("missing") is None
+
+
+def test_snapshot_missing_file(tmp_path):
+    snapshot = LaunchSnapshot(str(tmp_path / "none.snapshot"))
+
+    assert not snapshot.loaded
+    assert snapshot.version == 0
+    assert snapshot.launch("1") is None
+
+
+def test_missing_snapshot_is_probed_once_per_interval(tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.snapshot.time.monotonic", lambda: clock[0])
+    path = str(tmp_path / "launches.snapshot")
+    snapshot = LaunchSnapshot(path, check_interval=1.0)
+
+    assert not snapshot.loaded
+    write_snapshot(path, 1, *_data())
+
+    # Dentro del intervalo no se vuelve a abrir el archivo
+    clock[0] += 0.5
+    assert not snapshot.loaded
+
+    clock[0] += 0.6
+    assert snapshot.loaded
+    assert snapshot.version == 1
+
+
+def test_snapshot_hot_swaps_new_version(tmp_path):
+    path = str(tmp_path / "launches.snapshot")
+    write_snapshot(path, 1, *_data("Old"))
+    snapshot = LaunchSnapshot(path, check_interval=0)
+    old_body = snapshot.launch("1")
+
+    write_snapshot(path, 2, *_data("New"))
+
+    assert snapshot.version == 2
+    assert json.loads(bytes(snapshot.launch("1")))["mission_name"] == "New"
+    # La memoryview entregada antes apunta al mmap de la versión anterior,
+    # que sigue mapeado mientras ella exista
+    assert isinstance(old_body, memoryview)
+    assert json.loads(bytes(old_body))["mission_name"] == "Old"
+
+
+def test_only_one_refresher_loads(tmp_path):
+    path = str(tmp_path / "launches.snapshot")
+    calls = []
+
+    def build():
+        calls.append(1)
+        return _data()
+
+    leader = SnapshotRefresher(LaunchSnapshot(path, check_interval=0), build)
+    follower = SnapshotRefresher(LaunchSnapshot(path, check_interval=0), build)
+    try:
+        assert leader.refresh_once() is True
+        assert follower.refresh_once() is False
+        assert leader.is_leader and not follower.is_leader
+        assert len(calls) == 1
+
+        # Mismo contenido -> no se publica una nueva versión
+        assert leader.refresh_once() is False
+        assert leader.snapshot.version == 1
+    finally:
+        leader.stop()
+        follower.stop()
+
+    # Al liberar el lock, otro worker puede tomar el relevo
+    successor = SnapshotRefresher(LaunchSnapshot(path, check_interval=0), build)
+    try:
+        successor.refresh_once()
+        assert successor.is_leader
+    finally:
+        successor.stop()
@@ -0,0 +1,4 @@
+import time
+
+# Inicio de la carga del paquete; handler lo usa para medir init_duration_ms
+INIT_STARTED = time.perf_counter()
@@ -0,0 +1,158 @@
+"""
+Benchmark de transformación de lanzamientos a items de DynamoDB.
+
+Compara el LaunchRecord original (dataclass con __dict__, un timestamp por
+item) contra el LaunchRecord actual (slots + from_v4_batch).
+
+Uso (desde la raíz del repo):
+    python -m src.benchmarks.bench_launch_record [n_records]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.models import LaunchRecord
+
+
+@dataclass
+class LegacyLaunchRecord:
+    """Copia del LaunchRecord previo a slots, solo como línea base."""
+    launch_id: str
+    mission_name: str
+    rocket_id: str
+    launch_date_utc: str
+    launch_date_unix: int
+    status: str
+    launchpad_id: Optional[str] = None
+    details: Optional[str] = None
+    article_link: Optional[str] = None
+    wikipedia: Optional[str] = None
+    video_link: Optional[str] = None
+
+    @classmethod
+    def from_v4_dict(cls, data: Dict[str, Any]) -> "LegacyLaunchRecord":
+        upcoming = data.get("upcoming", False)
+        success = data.get("success")
+        if upcoming:
+            status = "upcoming"
+        elif success is True:
+            status = "success"
+        else:
+            status = "failed"
+
+        links = data.get("links", {}) or {}
+        return cls(
+            launch_id=data.get("id", ""),
+            mission_name=data.get("name", "Unknown"),
+            rocket_id=data.get("rocket", ""),
+            launch_date_utc=data.get("date_utc", ""),
+            launch_date_unix=data.get("date_unix", 0),
+            status=status,
+            launchpad_id=data.get("launchpad"),
+            details=data.get("details"),
+            article_link=links.get("article"),
+            wikipedia=links.get("wikipedia"),
+            video_link=links.get("webcast"),
+        )
+
+    def to_dynamo_item(self) -> Dict[str, Any]:
+        return {
+            "launch_id": self.launch_id,
+            "mission_name": self.mission_name,
+            "rocket_id": self.rocket_id,
+            "launch_date_utc": self.launch_date_utc,
+            "launch_date_unix": self.launch_date_unix,
+            "status": self.status,
+            "launchpad_id": self.launchpad_id,
+            "details": self.details,
+            "article_link": self.article_link,
+            "wikipedia": self.wikipedia,
+            "video_link": self.video_link,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+
+def make_rows(n: int) -> List[Dict[str, Any]]:
+    """Genera n lanzamientos v4 sintéticos (ids repetidos como en la API real)."""
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": f"launch{i:08d}",
+            "name": f"Mission {i}",
+            # Strings nuevos en cada fila, como los que produce json.loads
+            "rocket": "".join(["rocket", str(i % 4)]),
+            "launchpad": "".join(["pad", str(i % 6)]),
+            "date_utc": "2020-01-01T00:00:00.000Z",
+            "date_unix": 1577836800 + i,
+            "success": i % 3 != 0,
+            "upcoming": i % 10 == 0,
+            "details": None if i % 2 else "Some details",
+            "links": {
+                "article": None,
+                "wikipedia": f"https://en.wikipedia.org/wiki/M{i}",
+                "webcast": None,
+            },
+        })
+    return rows
+
+
+def legacy_transform(rows: List[Dict[str, Any]]):
+    records = [LegacyLaunchRecord.from_v4_dict(r) for r in rows]
+    return records, [r.to_dynamo_item() for r in records]
+
+
+def batch_transform(rows: List[Dict[str, Any]]):
+    records = LaunchRecord.from_v4_batch(rows)
+    return records, [r.to_dynamo_item() for r in records]
+
+
+def measure(
+    fn: Callable, rows: List[Dict[str, Any]], repeat: int = 5
+) -> Dict[str, float]:
+    # Mejor de `repeat` corridas, sin GC para reducir ruido
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(rows)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    elapsed = min(timings)
+
+    tracemalloc.start()
+    result = fn(rows)
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    n = len(rows)
+    return {
+        "seconds": elapsed,
+        "us_per_record": elapsed / n * 1e6,
+        "bytes_per_record": retained / n,
+    }
+
+
+def main(n: int = 100_000) -> None:
+    rows = make_rows(n)
+    legacy = measure(legacy_transform, rows)
+    batch = measure(batch_transform, rows)
+
+    print(f"records: {n}")
+    for name, res in (("legacy", legacy), ("batch", batch)):
+        print(
+            f"{name:>7}: {res['seconds']:.3f}s  "
+            f"{res['us_per_record']:.2f} us/record  "
+            f"{res['bytes_per_record']:.0f} B/record"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -2,44 +2,316 @@
 DynamoDB repository for SpaceX launches.
 """
 
+import hashlib
+import json
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
+# Clientes reutilizados entre invocaciones "warm" de la Lambda.
+# Se inicializan de forma perezosa en el primer uso.
+_dynamodb = None
+_tables: Dict[str, Any] = {}
+
+# Change feed: los items escritos por el sync llevan `change_feed` (partición
+# constante) y `updated_seq` (secuencia monotónica), indexados por un GSI
+# disperso que permite consultar solo lo modificado desde un token.
+CHANGE_FEED_PARTITION = "launches"
+CHANGE_SEQ_STATE_ID = "change_seq"
+
+# Lease del sync: evita ejecuciones solapadas (owner + expires_at)
+SYNC_LEASE_STATE_ID = "sync_lease"
+
+# Atributos de control que no forman parte del contenido del lanzamiento
+_NON_CONTENT_ATTRIBUTES = frozenset(
+    ("updated_at", "updated_seq", "change_feed", "content_hash")
+)
+
 
 class DynamoRepositoryError(Exception):
     """Custom exception for DynamoDB repository errors."""
     pass
 
 
-def _get_table():
+def _get_dynamodb():
+    """
+    Returns the module-level DynamoDB service resource, creating it on first use.
+
+    boto3 is imported here so that cold starts which never touch DynamoDB
+    (e.g. dry runs) do not pay for it.
+    """
+    global _dynamodb
+    if _dynamodb is None:
+        import boto3
+
+        _dynamodb = boto3.resource("dynamodb")
+    return _dynamodb
+
+
+def _get_table(
+    env_var: str = "LAUNCHES_TABLE_NAME", default: str = "spacex_launches"
+):
     """
     Returns a DynamoDB Table resource using the table name from env vars.
 
+    The Table resource is cached per table name and reused across calls
+    and warm invocations.
+
     Env:
-        LAUNCHES_TABLE_NAME: name of the DynamoDB table.
+        LAUNCHES_TABLE_NAME: name of the launches table.
+        SYNC_STATE_TABLE_NAME: name of the sync state table.
     """
-    table_name = os.environ.get("LAUNCHES_TABLE_NAME", "spacex_launches")
+    table_name = os.environ.get(env_var, default)
     if not table_name:
-        raise DynamoRepositoryError("LAUNCHES_TABLE_NAME env var is not set.")
+        raise DynamoRepositoryError(f"{env_var} env var is not set.")
+
+    table = _tables.get(table_name)
+    if table is None:
+        table = _get_dynamodb().Table(table_name)
+        _tables[table_name] = table
+    return table
+
+
+def _get_state_table():
+    """Returns the sync state table (change sequence counter)."""
+    return _get_table("SYNC_STATE_TABLE_NAME", "spacex_sync_state")
+
+
+def _content_hash(item: Dict[str, Any]) -> str:
+    """Stable hash of the launch content, ignoring control attributes."""
+    content = {k: v for k, v in item.items() if k not in _NON_CONTENT_ATTRIBUTES}
+    payload = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def reserve_change_sequence(count: int) -> int:
+    """
+    Reserve a block of `count` consecutive change sequence numbers.
+
+    Uses an atomic ADD on the counter item, so one call per sync run is
+    enough. Unused numbers (unchanged items) simply leave gaps.
+
+    Args:
+        count: size of the block.
+
+    Returns:
+        int: first sequence number of the reserved block.
+
+    Raises:
+        DynamoRepositoryError: on DynamoDB errors or invalid input.
+    """
+    if count < 1:
+        raise DynamoRepositoryError("count must be a positive integer.")
+
+    table = _get_state_table()
+
+    try:
+        response = table.update_item(
+            Key={"state_id": CHANGE_SEQ_STATE_ID},
+            UpdateExpression="ADD seq :count",
+            ExpressionAttributeValues={":count": count},
+            ReturnValues="UPDATED_NEW",
+        )
+    except (BotoCoreError, ClientError) as exc:
+        raise DynamoRepositoryError(f"Error reserving change sequence: {exc}")
+
+    last = int(response["Attributes"]["seq"])
+    return last - count + 1
+
+
+def commit_change_sequence(end_seq: int, now: int) -> None:
+    """
+    Publish `end_seq` as the committed high-water mark of the change feed.
+
+    Called once a sync run has written its whole block. Readers only
+    serve sequences up to this mark, so a partially written block is
+    never exposed. The mark never moves backwards.
+
+    Args:
+        end_seq: last sequence number of the completed block.
+        now: current epoch seconds (stored as committed_at).
+    """
+    table = _get_state_table()
+
+    try:
+        table.update_item(
+            Key={"state_id": CHANGE_SEQ_STATE_ID},
+            UpdateExpression="SET committed_seq = :end, committed_at = :now",
+            ConditionExpression=(
+                "attribute_not_exists(committed_seq) OR committed_seq < :end"
+            ),
+            ExpressionAttributeValues={":end": end_seq, ":now": now},
+        )
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return
+        raise DynamoRepositoryError(f"Error committing change sequence: {exc}")
+    except BotoCoreError as exc:
+        raise DynamoRepositoryError(f"Error committing change sequence: {exc}")
+
+
+def _is_conditional_failure(exc: ClientError) -> bool:
+    return exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def get_sync_state() -> Dict[str, Any]:
+    """
+    Retrieve the sync lease item (owner, expires_at, last run info).
+
+    Returns:
+        dict: the item, or {} if no sync has ever run.
+    """
+    table = _get_state_table()
+
+    try:
+        response = table.get_item(
+            Key={"state_id": SYNC_LEASE_STATE_ID}, ConsistentRead=True
+        )
+    except (BotoCoreError, ClientError) as exc:
+        raise DynamoRepositoryError(f"Error reading sync state: {exc}")
+
+    return response.get("Item", {})
+
+
+def acquire_sync_lease(
+    owner: str, ttl_seconds: int, now: int, min_interval_seconds: int = 0
+) -> bool:
+    """
+    Try to take the sync lease with a conditional write.
+
+    Succeeds if nobody holds the lease (or it has expired) and, when
+    `min_interval_seconds` > 0, the last completed run is older than that.
+    Both checks are part of the same conditional write, so they are atomic.
+
+    Args:
+        owner: unique id of the run (e.g. Lambda request id).
+        ttl_seconds: lease duration; renewed with heartbeat_sync_lease.
+        now: current epoch seconds.
+        min_interval_seconds: minimum time since the last completed run.
+
+    Returns:
+        bool: True if the lease was acquired.
+    """
+    table = _get_state_table()
+
+    condition = "(attribute_not_exists(expires_at) OR expires_at < :now)"
+    values: Dict[str, Any] = {
+        ":owner": owner,
+        ":expires": now + ttl_seconds,
+        ":now": now,
+    }
+    if min_interval_seconds > 0:
+        condition += (
+            " AND (attribute_not_exists(last_completed_at)"
+            " OR last_completed_at < :cutoff)"
+        )
+        values[":cutoff"] = now - min_interval_seconds
+
+    try:
+        table.update_item(
+            Key={"state_id": SYNC_LEASE_STATE_ID},
+            UpdateExpression=(
+                "SET #owner = :owner, expires_at = :expires, "
+                "heartbeat_at = :now, started_at = :now"
+            ),
+            ConditionExpression=condition,
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return False
+        raise DynamoRepositoryError(f"Error acquiring sync lease: {exc}")
+    except BotoCoreError as exc:
+        raise DynamoRepositoryError(f"Error acquiring sync lease: {exc}")
+
+    return True
 
-    dynamodb = boto3.resource("dynamodb")
-    return dynamodb.Table(table_name)
+
+def heartbeat_sync_lease(owner: str, ttl_seconds: int, now: int) -> bool:
+    """
+    Extend the lease held by `owner`.
+
+    Returns:
+        bool: False if `owner` no longer holds the lease.
+    """
+    table = _get_state_table()
+
+    try:
+        table.update_item(
+            Key={"state_id": SYNC_LEASE_STATE_ID},
+            UpdateExpression="SET expires_at = :expires, heartbeat_at = :now",
+            ConditionExpression="#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={
+                ":owner": owner,
+                ":expires": now + ttl_seconds,
+                ":now": now,
+            },
+        )
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return False
+        raise DynamoRepositoryError(f"Error renewing sync lease: {exc}")
+    except BotoCoreError as exc:
+        raise DynamoRepositoryError(f"Error renewing sync lease: {exc}")
+
+    return True
+
+
+def release_sync_lease(
+    owner: str, now: int, summary: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Release the lease held by `owner`.
+
+    If `summary` is given the run is recorded as the last completed sync,
+    so later triggers inside the minimum interval can reuse it.
+    A lease that was already taken over by another owner is left untouched.
+    """
+    table = _get_state_table()
+
+    update = "SET expires_at = :zero"
+    values: Dict[str, Any] = {":owner": owner, ":zero": 0}
+    if summary is not None:
+        update += ", last_completed_at = :now, last_summary = :summary"
+        values[":now"] = now
+        values[":summary"] = json.dumps(summary)
+
+    try:
+        table.update_item(
+            Key={"state_id": SYNC_LEASE_STATE_ID},
+            UpdateExpression=update,
+            ConditionExpression="#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return
+        raise DynamoRepositoryError(f"Error releasing sync lease: {exc}")
+    except BotoCoreError as exc:
+        raise DynamoRepositoryError(f"Error releasing sync lease: {exc}")
 
 
-def upsert_launch(item: Dict[str, Any]) -> str:
+def upsert_launch(item: Dict[str, Any], updated_seq: Optional[int] = None) -> str:
     """
     Insert or update a launch item in DynamoDB.
 
     Uses PutItem with ReturnValues='ALL_OLD' to detect if the item existed.
 
+    When `updated_seq` is given the item joins the change feed: it is
+    stamped with the sequence and a content hash, and only written if its
+    content differs from the stored one.
+
     Args:
         item: dict with at least 'launch_id' as primary key.
+        updated_seq: change sequence number for this write.
 
     Returns:
-        str: "inserted" if new item, "updated" if it replaced an existing item.
+        str: "inserted" if new item, "updated" if it replaced an existing item,
+        "unchanged" if the stored item already had the same content.
 
     Raises:
         DynamoRepositoryError: on DynamoDB errors or invalid input.
@@ -49,12 +321,30 @@ def upsert_launch(item: Dict[str, Any]) -> str:
 
     table = _get_table()
 
-    try:
-        response = table.put_item(
-            Item=item,
-            ReturnValues="ALL_OLD",  # if existed, returns old item
+    put_kwargs: Dict[str, Any] = {
+        "Item": item,
+        "ReturnValues": "ALL_OLD",  # if existed, returns old item
+    }
+    if updated_seq is not None:
+        content_hash = _content_hash(item)
+        put_kwargs["Item"] = {
+            **item,
+            "content_hash": content_hash,
+            "change_feed": CHANGE_FEED_PARTITION,
+            "updated_seq": updated_seq,
+        }
+        put_kwargs["ConditionExpression"] = (
+            "attribute_not_exists(content_hash) OR content_hash <> :content_hash"
         )
-    except (BotoCoreError, ClientError) as exc:
+        put_kwargs["ExpressionAttributeValues"] = {":content_hash": content_hash}
+
+    try:
+        response = table.put_item(**put_kwargs)
+    except ClientError as exc:
+        if updated_seq is not None and _is_conditional_failure(exc):
+            return "unchanged"
+        raise DynamoRepositoryError(f"Error writing item to DynamoDB: {exc}")
+    except BotoCoreError as exc:
         raise DynamoRepositoryError(f"Error writing item to DynamoDB: {exc}")
 
     if "Attributes" in response:
@@ -1,81 +1,221 @@
 import json
 import logging
-from typing import Any, Dict, Optional
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
 
+from . import INIT_STARTED
 from .spacex_client import fetch_launches, SpaceXAPIError
 from .models import LaunchRecord
-from .dynamo_repository import upsert_launch, DynamoRepositoryError
+from .dynamo_repository import (
+    DynamoRepositoryError,
+    acquire_sync_lease,
+    commit_change_sequence,
+    get_sync_state,
+    heartbeat_sync_lease,
+    release_sync_lease,
+    reserve_change_sequence,
+    upsert_launch,
+)
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Duración de los imports del paquete (desde src/__init__.py), medida una vez.
+# No incluye el arranque del runtime de Lambda (ver "Init Duration" en la
+# línea REPORT de CloudWatch) ni boto3, que se importa y crea de forma
+# perezosa y por tanto cuenta en el duration_ms de la primera invocación.
+_INIT_DURATION_MS = round((time.perf_counter() - INIT_STARTED) * 1000, 2)
+_cold_start = True
 
-def _parse_dry_run(event: Dict[str, Any]) -> bool:
+# Lease del sync (segundos). El TTL debe superar el timeout de la Lambda.
+SYNC_LEASE_TTL_SECONDS = int(os.environ.get("SYNC_LEASE_TTL_SECONDS", "150"))
+SYNC_HEARTBEAT_SECONDS = int(os.environ.get("SYNC_HEARTBEAT_SECONDS", "30"))
+# Un sync manual dentro de este intervalo reutiliza el resumen del anterior.
+SYNC_MIN_INTERVAL_SECONDS = int(os.environ.get("SYNC_MIN_INTERVAL_SECONDS", "300"))
+
+
+class SyncLeaseLostError(Exception):
+    """Raised when the running sync no longer holds the lease."""
+    pass
+
+
+def _parse_flag(event: Dict[str, Any], name: str) -> bool:
     """
-    Determina si la ejecución es dry_run leyendo:
-    - event["dry_run"] directamente (invocación manual)
-    - event["queryStringParameters"]["dry_run"] si viene por API Gateway
+    Lee un flag booleano desde:
+    - event[name] directamente (invocación manual)
+    - event["queryStringParameters"][name] si viene por API Gateway
     """
     # Invocación directa desde Lambda test o SDK
-    if isinstance(event.get("dry_run"), bool):
-        return event["dry_run"]
+    if isinstance(event.get(name), bool):
+        return event[name]
 
-    if isinstance(event.get("dry_run"), str):
-        return event["dry_run"].lower() in ("true", "1", "yes")
+    if isinstance(event.get(name), str):
+        return event[name].lower() in ("true", "1", "yes")
 
     # Invocación vía API Gateway (REST/HTTP)
     qsp = event.get("queryStringParameters") or {}
-    dry_param: Optional[str] = qsp.get("dry_run")
-    if dry_param is not None:
-        return dry_param.lower() in ("true", "1", "yes")
+    param: Optional[str] = qsp.get(name)
+    if param is not None:
+        return param.lower() in ("true", "1", "yes")
 
     return False
 
 
-def sync_launches(dry_run: bool = False) -> Dict[str, Any]:
+def _parse_dry_run(event: Dict[str, Any]) -> bool:
+    """Determina si la ejecución es dry_run."""
+    return _parse_flag(event, "dry_run")
+
+
+def sync_launches(
+    dry_run: bool = False,
+    heartbeat: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
     """
     Sincroniza todos los lanzamientos de SpaceX a DynamoDB.
 
     Args:
         dry_run: si es True, no escribe en Dynamo, solo cuenta.
+        heartbeat: callback invocado en cada item (renovación del lease).
 
     Returns:
         dict: resumen de la operación.
     """
+    started = time.perf_counter()
+
     logger.info("Starting launches sync (dry_run=%s)", dry_run)
 
     raw_launches = fetch_launches()
     total = len(raw_launches)
     inserted = 0
     updated = 0
+    unchanged = 0
 
     logger.info("Fetched %d launches from SpaceX API", total)
 
-    for raw in raw_launches:
-        record = LaunchRecord.from_v4_dict(raw)
+    # Un bloque de secuencias del change feed por ejecución
+    next_seq = 0
+    if not dry_run and total:
+        next_seq = reserve_change_sequence(total)
+
+    for record in LaunchRecord.from_v4_batch(raw_launches):
         item = record.to_dynamo_item()
 
         if dry_run:
             # Solo contamos, no escribimos en Dynamo
             continue
 
-        result = upsert_launch(item)
+        if heartbeat is not None:
+            heartbeat()
+
+        result = upsert_launch(item, updated_seq=next_seq)
+        next_seq += 1
         if result == "inserted":
             inserted += 1
-        else:
+        elif result == "updated":
             updated += 1
+        else:
+            unchanged += 1
+
+    # Solo un bloque escrito completo se publica a los lectores del change feed
+    if not dry_run and total:
+        commit_change_sequence(next_seq - 1, int(time.time()))
 
     summary = {
         "total_fetched": total,
         "inserted": inserted,
         "updated": updated,
+        "unchanged": unchanged,
         "dry_run": dry_run,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
     }
 
     logger.info("Sync summary: %s", summary)
     return summary
 
 
+def _blocked_sync(state: Dict[str, Any], now: int, force: bool) -> Optional[Dict[str, Any]]:
+    """
+    Explica por qué no se pudo tomar el lease a partir del estado leído
+    después del intento; None si el estado ya no lo impide.
+    """
+    expires_at = int(state.get("expires_at", 0))
+    if expires_at >= now:
+        logger.info("Sync already in progress (owner=%s)", state.get("owner"))
+        return {
+            "status": "in_progress",
+            "lease_owner": state.get("owner"),
+            "lease_expires_at": expires_at,
+        }
+
+    last_completed_at = int(state.get("last_completed_at", 0))
+    if not force and now - last_completed_at < SYNC_MIN_INTERVAL_SECONDS:
+        logger.info("Skipping sync, last run completed at %d", last_completed_at)
+        last_summary = state.get("last_summary")
+        return {
+            "status": "recent",
+            "summary": json.loads(last_summary) if last_summary else None,
+            "last_completed_at": last_completed_at,
+        }
+
+    return None
+
+
+def coordinated_sync(owner: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Ejecuta sync_launches protegido por el lease de DynamoDB.
+
+    La toma del lease comprueba en la misma escritura condicional que no
+    haya otro sync en curso y (salvo `force`) que el último terminara hace
+    más de SYNC_MIN_INTERVAL_SECONDS. Si falla, se relee el estado:
+
+    - Otro sync tiene el lease -> {"status": "in_progress"} (sin trabajo).
+    - Sync reciente -> {"status": "recent"} con el resumen de esa ejecución.
+    - Si no -> toma el lease, sincroniza con heartbeat y lo libera.
+    """
+    min_interval = 0 if force else SYNC_MIN_INTERVAL_SECONDS
+
+    # Un reintento: el lease pudo liberarse entre la escritura y la lectura
+    for _ in range(2):
+        now = int(time.time())
+        if acquire_sync_lease(owner, SYNC_LEASE_TTL_SECONDS, now, min_interval):
+            break
+        state = get_sync_state()
+        blocked = _blocked_sync(state, now, force)
+        if blocked is not None:
+            return blocked
+    else:
+        return {
+            "status": "in_progress",
+            "lease_owner": state.get("owner"),
+            "lease_expires_at": int(state.get("expires_at", 0)),
+        }
+
+    last_beat = time.monotonic()
+
+    def heartbeat() -> None:
+        nonlocal last_beat
+        if time.monotonic() - last_beat < SYNC_HEARTBEAT_SECONDS:
+            return
+        last_beat = time.monotonic()
+        if not heartbeat_sync_lease(owner, SYNC_LEASE_TTL_SECONDS, int(time.time())):
+            raise SyncLeaseLostError(f"Sync lease lost by {owner}")
+
+    summary = None
+    try:
+        summary = sync_launches(dry_run=False, heartbeat=heartbeat)
+    finally:
+        # Un fallo al liberar no debe ocultar el error original del sync;
+        # el lease caduca solo por TTL
+        try:
+            release_sync_lease(owner, int(time.time()), summary=summary)
+        except DynamoRepositoryError:
+            logger.exception("Failed to release sync lease (owner=%s)", owner)
+
+    return {"status": "completed", "summary": summary}
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda entrypoint.
@@ -84,17 +224,56 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     - Por EventBridge (cron cada 6h) -> event será casi vacío.
     - Manualmente (test en consola Lambda) pasando {"dry_run": true}.
     - Vía API Gateway, leyendo query param ?dry_run=true.
+
+    Los syncs reales se coordinan con un lease (ver coordinated_sync);
+    ?force=true ignora el intervalo mínimo entre ejecuciones.
+
+    Toda respuesta incluye "invocation" con cold_start, init_duration_ms
+    y duration_ms, también cuando no se llega a sincronizar.
     """
+    global _cold_start
+    started = time.perf_counter()
+    cold_start = _cold_start
+    _cold_start = False
+
     logger.info("Received event: %s", json.dumps(event))
 
     dry_run = _parse_dry_run(event)
+    force = _parse_flag(event, "force")
+    owner = getattr(context, "aws_request_id", None) or uuid.uuid4().hex
 
     try:
-        summary = sync_launches(dry_run=dry_run)
-        status_code = 200
+        if dry_run:
+            result = {"status": "completed", "summary": sync_launches(dry_run=True)}
+        else:
+            result = coordinated_sync(owner, force=force)
+
+        if result["status"] == "in_progress":
+            status_code = 202
+            body = {
+                "message": "Launches sync already in progress",
+                "lease_owner": result["lease_owner"],
+                "lease_expires_at": result["lease_expires_at"],
+            }
+        elif result["status"] == "recent":
+            status_code = 200
+            body = {
+                "message": "Launches sync skipped, returning last completed run",
+                "summary": result["summary"],
+                "last_completed_at": result["last_completed_at"],
+            }
+        else:
+            status_code = 200
+            body = {
+                "message": "Launches sync completed",
+                "summary": result["summary"],
+            }
+    except SyncLeaseLostError as exc:
+        logger.exception("Sync lease lost")
+        status_code = 409
         body = {
-            "message": "Launches sync completed",
-            "summary": summary,
+            "message": "Launches sync aborted, lease taken over by another run",
+            "error": str(exc),
         }
     except SpaceXAPIError as exc:
         logger.exception("SpaceX API error")
@@ -118,6 +297,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             "error": str(exc),
         }
 
+    body["invocation"] = {
+        "cold_start": cold_start,
+        "init_duration_ms": _INIT_DURATION_MS if cold_start else 0.0,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    logger.info("Invocation timings: %s", body["invocation"])
+
     return {
         "statusCode": status_code,
         "headers": {"Content-Type": "application/json"},
@@ -1,9 +1,10 @@
+import sys
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
 
 
-@dataclass
+@dataclass(slots=True)
 class LaunchRecord:
     """Minimal launch representation for DynamoDB."""
     launch_id: str
@@ -17,47 +18,74 @@ class LaunchRecord:
     article_link: Optional[str] = None
     wikipedia: Optional[str] = None
     video_link: Optional[str] = None
+    updated_at: Optional[str] = None
 
     @classmethod
-    def from_v4_dict(cls, data: Dict[str, Any]) -> "LaunchRecord":
+    def from_v4_dict(
+        cls, data: Dict[str, Any], updated_at: Optional[str] = None
+    ) -> "LaunchRecord":
+        get = data.get
+
         # status derivado de success + upcoming
-        upcoming = data.get("upcoming", False)
-        success = data.get("success")
-        if upcoming:
+        if get("upcoming", False):
             status = "upcoming"
-        elif success is True:
+        elif get("success") is True:
             status = "success"
         else:
             status = "failed"
 
-        links = data.get("links", {}) or {}
+        # rocket/launchpad se repiten en casi todos los lanzamientos
+        rocket_id = get("rocket") or ""
+        launchpad_id = get("launchpad")
+
+        links = get("links") or {}
         return cls(
-            launch_id=data.get("id", ""),
-            mission_name=data.get("name", "Unknown"),
-            rocket_id=data.get("rocket", ""),
-            launch_date_utc=data.get("date_utc", ""),
-            launch_date_unix=data.get("date_unix", 0),
+            launch_id=get("id", ""),
+            mission_name=get("name", "Unknown"),
+            rocket_id=sys.intern(rocket_id) if rocket_id else rocket_id,
+            launch_date_utc=get("date_utc", ""),
+            launch_date_unix=get("date_unix", 0),
             status=status,
-            launchpad_id=data.get("launchpad"),
-            details=data.get("details"),
+            launchpad_id=sys.intern(launchpad_id) if launchpad_id else launchpad_id,
+            details=get("details"),
             article_link=links.get("article"),
             wikipedia=links.get("wikipedia"),
             video_link=links.get("webcast"),
+            updated_at=updated_at,
         )
 
+    @classmethod
+    def from_v4_batch(cls, rows: Iterable[Dict[str, Any]]) -> List["LaunchRecord"]:
+        """
+        Transforma un lote de lanzamientos v4 compartiendo un único
+        timestamp `updated_at` para todo el lote.
+        """
+        updated_at = datetime.utcnow().isoformat()
+        return [cls.from_v4_dict(row, updated_at) for row in rows]
+
     def to_dynamo_item(self) -> Dict[str, Any]:
-        """Dict listo para PutItem en Dynamo."""
-        return {
+        """Dict listo para PutItem en Dynamo (sin atributos None)."""
+        item = {
             "launch_id": self.launch_id,          # PK principal
             "mission_name": self.mission_name,
             "rocket_id": self.rocket_id,
             "launch_date_utc": self.launch_date_utc,
             "launch_date_unix": self.launch_date_unix,
             "status": self.status,
-            "launchpad_id": self.launchpad_id,
-            "details": self.details,
-            "article_link": self.article_link,
-            "wikipedia": self.wikipedia,
-            "video_link": self.video_link,
-            "updated_at": datetime.utcnow().isoformat(),
+            "updated_at": self.updated_at or datetime.utcnow().isoformat(),
         }
+        for name in _OPTIONAL_ATTRIBUTES:
+            value = getattr(self, name)
+            if value is not None:
+                item[name] = value
+        return item
+
+
+# Atributos que se omiten del item si son None
+_OPTIONAL_ATTRIBUTES = (
+    "launchpad_id",
+    "details",
+    "article_link",
+    "wikipedia",
+    "video_link",
+)
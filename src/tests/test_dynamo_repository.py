@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from src import dynamo_repository
+
+
+@patch.object(dynamo_repository, "_tables", {})
+@patch.object(dynamo_repository, "_dynamodb", None)
+def test_get_table_reuses_resource(monkeypatch):
+    monkeypatch.setenv("LAUNCHES_TABLE_NAME", "test-table")
+    mock_resource = MagicMock()
+
+    with patch("boto3.resource", return_value=mock_resource) as mock_boto3:
+        first = dynamo_repository._get_table()
+        second = dynamo_repository._get_table()
+
+    assert first is second
+    mock_boto3.assert_called_once_with("dynamodb")
+    mock_resource.Table.assert_called_once_with("test-table")
+
+
+@patch.object(dynamo_repository, "_get_table")
+def test_upsert_launch_inserted_and_updated(mock_get_table):
+    mock_get_table.return_value.put_item.side_effect = [{}, {"Attributes": {}}]
+
+    assert dynamo_repository.upsert_launch({"launch_id": "1"}) == "inserted"
+    assert dynamo_repository.upsert_launch({"launch_id": "1"}) == "updated"
+
+
+@patch.object(dynamo_repository, "_get_state_table")
+def test_reserve_change_sequence_returns_block_start(mock_get_state_table):
+    mock_get_state_table.return_value.update_item.return_value = {
+        "Attributes": {"seq": 15}
+    }
+
+    assert dynamo_repository.reserve_change_sequence(5) == 11
+
+
+@patch.object(dynamo_repository, "_get_table")
+def test_upsert_launch_with_seq_is_conditional(mock_get_table):
+    put_item = mock_get_table.return_value.put_item
+    put_item.side_effect = [
+        {},
+        ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+            "PutItem",
+        ),
+    ]
+
+    item = {"launch_id": "1", "mission_name": "M", "updated_at": "t1"}
+    assert dynamo_repository.upsert_launch(item, updated_seq=7) == "inserted"
+    assert dynamo_repository.upsert_launch(item, updated_seq=8) == "unchanged"
+
+    written = put_item.call_args_list[0].kwargs["Item"]
+    assert written["updated_seq"] == 7
+    assert written["change_feed"] == dynamo_repository.CHANGE_FEED_PARTITION
+    assert "ConditionExpression" in put_item.call_args_list[0].kwargs
+
+    # updated_at no forma parte del hash de contenido
+    assert dynamo_repository._content_hash(item) == dynamo_repository._content_hash(
+        {**item, "updated_at": "t2"}
+    )
+
+
+@patch.object(dynamo_repository, "_get_state_table")
+def test_acquire_sync_lease_conditional(mock_get_state_table):
+    update_item = mock_get_state_table.return_value.update_item
+    update_item.side_effect = [
+        {},
+        ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+            "UpdateItem",
+        ),
+    ]
+
+    assert dynamo_repository.acquire_sync_lease("run-1", 150, now=1000) is True
+    assert dynamo_repository.acquire_sync_lease("run-2", 150, now=1001) is False
+
+    kwargs = update_item.call_args_list[0].kwargs
+    assert kwargs["ExpressionAttributeValues"][":expires"] == 1150
+    assert "expires_at < :now" in kwargs["ConditionExpression"]
+    assert ":cutoff" not in kwargs["ConditionExpression"]
+
+
+@patch.object(dynamo_repository, "_get_state_table")
+def test_acquire_sync_lease_checks_min_interval_atomically(mock_get_state_table):
+    update_item = mock_get_state_table.return_value.update_item
+
+    dynamo_repository.acquire_sync_lease("run-1", 150, now=1000, min_interval_seconds=300)
+
+    kwargs = update_item.call_args.kwargs
+    assert "last_completed_at < :cutoff" in kwargs["ConditionExpression"]
+    assert kwargs["ExpressionAttributeValues"][":cutoff"] == 700
+
+
+@patch.object(dynamo_repository, "_get_state_table")
+def test_commit_change_sequence_never_moves_backwards(mock_get_state_table):
+    update_item = mock_get_state_table.return_value.update_item
+    update_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}},
+        "UpdateItem",
+    )
+
+    # Una marca más antigua que la guardada se ignora sin error
+    dynamo_repository.commit_change_sequence(5, now=1000)
+
+    kwargs = update_item.call_args.kwargs
+    assert kwargs["ExpressionAttributeValues"][":end"] == 5
+    assert "committed_seq < :end" in kwargs["ConditionExpression"]
@@ -1,39 +1,55 @@
 import json
-from unittest.mock import patch
+import time
+from unittest.mock import MagicMock, patch
 
-from src.handler import sync_launches, lambda_handler
+from src.dynamo_repository import DynamoRepositoryError
+from src.handler import SYNC_MIN_INTERVAL_SECONDS, sync_launches, lambda_handler
+from src.spacex_client import SpaceXAPIError
 
 
+@patch("src.handler.commit_change_sequence")
+@patch("src.handler.reserve_change_sequence", return_value=10)
 @patch("src.handler.upsert_launch")
 @patch("src.handler.LaunchRecord")
 @patch("src.handler.fetch_launches")
-def test_sync_launches_persists_data(mock_fetch, mock_launch_record_cls, mock_upsert):
+def test_sync_launches_persists_data(
+    mock_fetch, mock_launch_record_cls, mock_upsert, mock_reserve, mock_commit
+):
     # Mock SpaceX data
     mock_fetch.return_value = [
         {"id": "1", "name": "Launch 1"},
         {"id": "2", "name": "Launch 2"},
+        {"id": "3", "name": "Launch 3"},
     ]
 
-    # LaunchRecord.from_v4_dict -> instancia mock con to_dynamo_item
-    mock_record_instance = mock_launch_record_cls.from_v4_dict.return_value
+    # LaunchRecord.from_v4_batch -> lista de instancias mock con to_dynamo_item
+    mock_record_instance = MagicMock()
     mock_record_instance.to_dynamo_item.return_value = {"launch_id": "1"}
+    mock_launch_record_cls.from_v4_batch.return_value = [mock_record_instance] * 3
 
-    # Primer put -> inserted, segundo -> updated
-    mock_upsert.side_effect = ["inserted", "updated"]
+    # Primer put -> inserted, segundo -> updated, tercero -> unchanged
+    mock_upsert.side_effect = ["inserted", "updated", "unchanged"]
 
     summary = sync_launches(dry_run=False)
 
-    assert summary["total_fetched"] == 2
+    assert summary["total_fetched"] == 3
     assert summary["inserted"] == 1
     assert summary["updated"] == 1
+    assert summary["unchanged"] == 1
 
     assert mock_fetch.called
-    assert mock_launch_record_cls.from_v4_dict.call_count == 2
-    assert mock_upsert.call_count == 2
+    mock_launch_record_cls.from_v4_batch.assert_called_once_with(mock_fetch.return_value)
+    assert mock_upsert.call_count == 3
+    mock_reserve.assert_called_once_with(3)
+    assert [c.kwargs["updated_seq"] for c in mock_upsert.call_args_list] == [10, 11, 12]
+    assert mock_commit.call_args.args[0] == 12
 
 
+@patch("src.handler.release_sync_lease")
+@patch("src.handler.acquire_sync_lease", return_value=True)
+@patch("src.handler.get_sync_state", return_value={})
 @patch("src.handler.sync_launches")
-def test_lambda_handler_success(mock_sync):
+def test_lambda_handler_success(mock_sync, mock_state, mock_acquire, mock_release):
     mock_sync.return_value = {
         "total_fetched": 3,
         "inserted": 2,
@@ -49,7 +65,10 @@ def test_lambda_handler_success(mock_sync):
     body = json.loads(result["body"])
     assert body["message"] == "Launches sync completed"
     assert body["summary"]["total_fetched"] == 3
-    mock_sync.assert_called_once_with(dry_run=False)
+    mock_sync.assert_called_once()
+    assert mock_sync.call_args.kwargs["dry_run"] is False
+    assert mock_acquire.called
+    assert mock_release.call_args.kwargs["summary"] == mock_sync.return_value
 
 
 @patch("src.handler.sync_launches")
@@ -70,3 +89,142 @@ def test_lambda_handler_dry_run_detection(mock_sync):
     body = json.loads(result["body"])
     assert body["summary"]["dry_run"] is True
     mock_sync.assert_called_once_with(dry_run=True)
+
+
+@patch("src.handler.acquire_sync_lease", return_value=False)
+@patch("src.handler.get_sync_state")
+@patch("src.handler.sync_launches")
+def test_lambda_handler_reuses_recent_run(mock_sync, mock_state, mock_acquire):
+    mock_state.return_value = {
+        "expires_at": 0,
+        "last_completed_at": int(time.time()) - 10,
+        "last_summary": json.dumps({"total_fetched": 5}),
+    }
+
+    result = lambda_handler({}, context=None)
+
+    assert result["statusCode"] == 200
+    body = json.loads(result["body"])
+    assert body["summary"]["total_fetched"] == 5
+    mock_sync.assert_not_called()
+    # El intervalo mínimo se comprueba en la propia escritura condicional
+    assert mock_acquire.call_args.args[3] == SYNC_MIN_INTERVAL_SECONDS
+
+
+@patch("src.handler.release_sync_lease")
+@patch("src.handler.acquire_sync_lease", return_value=True)
+@patch("src.handler.get_sync_state")
+@patch("src.handler.sync_launches")
+def test_lambda_handler_force_ignores_min_interval(
+    mock_sync, mock_state, mock_acquire, mock_release
+):
+    mock_state.return_value = {
+        "last_completed_at": int(time.time()) - 10,
+        "last_summary": json.dumps({"total_fetched": 5}),
+    }
+    mock_sync.return_value = {"total_fetched": 6}
+
+    result = lambda_handler({"queryStringParameters": {"force": "true"}}, context=None)
+
+    assert result["statusCode"] == 200
+    assert json.loads(result["body"])["summary"]["total_fetched"] == 6
+    mock_sync.assert_called_once()
+    assert mock_acquire.call_args.args[3] == 0
+    mock_state.assert_not_called()
+
+
+@patch("src.handler.acquire_sync_lease", return_value=False)
+@patch("src.handler.get_sync_state")
+@patch("src.handler.sync_launches")
+def test_lambda_handler_coalesces_in_flight_run(mock_sync, mock_state, mock_acquire):
+    mock_state.return_value = {"owner": "other-run", "expires_at": 2000000000}
+
+    result = lambda_handler({}, context=None)
+
+    assert result["statusCode"] == 202
+    body = json.loads(result["body"])
+    assert body["lease_owner"] == "other-run"
+    mock_sync.assert_not_called()
+    # El estado se lee después del intento fallido, no antes
+    assert mock_acquire.call_count == 1
+    assert mock_state.call_count == 1
+
+
+@patch("src.handler.release_sync_lease")
+@patch("src.handler.acquire_sync_lease", side_effect=[False, True])
+@patch("src.handler.get_sync_state")
+@patch("src.handler.sync_launches")
+def test_lambda_handler_retries_when_lease_freed_after_failed_acquire(
+    mock_sync, mock_state, mock_acquire, mock_release
+):
+    # El otro sync liberó el lease entre la escritura y la relectura
+    mock_state.return_value = {"owner": "other-run", "expires_at": 0}
+    mock_sync.return_value = {"total_fetched": 7}
+
+    result = lambda_handler({}, context=None)
+
+    assert result["statusCode"] == 200
+    assert json.loads(result["body"])["summary"]["total_fetched"] == 7
+    assert mock_acquire.call_count == 2
+
+
+@patch("src.handler.SYNC_HEARTBEAT_SECONDS", 0)
+@patch("src.handler.commit_change_sequence")
+@patch("src.handler.release_sync_lease")
+@patch("src.handler.heartbeat_sync_lease", return_value=False)
+@patch("src.handler.acquire_sync_lease", return_value=True)
+@patch("src.handler.get_sync_state", return_value={})
+@patch("src.handler.reserve_change_sequence", return_value=1)
+@patch("src.handler.upsert_launch")
+@patch("src.handler.fetch_launches")
+def test_lambda_handler_aborts_when_lease_lost(
+    mock_fetch, mock_upsert, mock_reserve, mock_state, mock_acquire,
+    mock_heartbeat, mock_release, mock_commit,
+):
+    mock_fetch.return_value = [{"id": "1", "name": "Launch 1"}]
+
+    result = lambda_handler({}, context=None)
+
+    assert result["statusCode"] == 409
+    mock_upsert.assert_not_called()
+    mock_commit.assert_not_called()
+    assert mock_release.call_args.kwargs["summary"] is None
+
+
+@patch("src.handler.acquire_sync_lease", return_value=False)
+@patch("src.handler.get_sync_state")
+@patch("src.handler.sync_launches")
+def test_lambda_handler_reports_timings_on_every_invocation(
+    mock_sync, mock_state, mock_acquire
+):
+    mock_state.return_value = {"owner": "other-run", "expires_at": 2000000000}
+
+    with patch("src.handler._cold_start", True):
+        first = lambda_handler({}, context=None)
+        second = lambda_handler({}, context=None)
+
+    # Un 202 también consume el cold start
+    assert first["statusCode"] == 202
+    first_timings = json.loads(first["body"])["invocation"]
+    assert first_timings["cold_start"] is True
+    assert first_timings["init_duration_ms"] >= 0
+    assert first_timings["duration_ms"] >= 0
+
+    second_timings = json.loads(second["body"])["invocation"]
+    assert second_timings["cold_start"] is False
+    assert second_timings["init_duration_ms"] == 0.0
+    mock_sync.assert_not_called()
+
+
+@patch("src.handler.release_sync_lease", side_effect=DynamoRepositoryError("boom"))
+@patch("src.handler.acquire_sync_lease", return_value=True)
+@patch("src.handler.sync_launches", side_effect=SpaceXAPIError("down"))
+def test_lambda_handler_release_failure_keeps_original_error(
+    mock_sync, mock_acquire, mock_release
+):
+    result = lambda_handler({}, context=None)
+
+    # El error de la SpaceX API se mantiene (502), no el de la liberación
+    assert result["statusCode"] == 502
+    assert json.loads(result["body"])["error"] == "down"
+    mock_release.assert_called_once()
@@ -1,3 +1,5 @@
+import pytest
+
 from src.models import LaunchRecord
 
 
@@ -55,3 +57,53 @@ def test_launch_record_to_dynamo_item():
     assert item["launch_date_unix"] == 1577836800
     assert item["status"] == "upcoming"
     assert "updated_at" in item  # timestamp
+
+
+def test_launch_record_is_slotted():
+    record = LaunchRecord(
+        launch_id="abc123",
+        mission_name="Test Mission",
+        rocket_id="rocket123",
+        launch_date_utc="2020-01-01T00:00:00.000Z",
+        launch_date_unix=1577836800,
+        status="success",
+    )
+
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.extra = "value"
+
+
+def test_launch_record_to_dynamo_item_drops_none():
+    record = LaunchRecord(
+        launch_id="abc123",
+        mission_name="Test Mission",
+        rocket_id="rocket123",
+        launch_date_utc="2020-01-01T00:00:00.000Z",
+        launch_date_unix=1577836800,
+        status="failed",
+        details=None,
+    )
+
+    item = record.to_dynamo_item()
+
+    assert "details" not in item
+    assert "launchpad_id" not in item
+    assert None not in item.values()
+
+
+def test_launch_record_from_v4_batch_shares_timestamp_and_interns_ids():
+    rows = [
+        {"id": str(i), "name": f"M{i}", "rocket": "".join(["rocket", "123"]),
+         "launchpad": "".join(["pad", "42"]), "upcoming": True}
+        for i in range(3)
+    ]
+
+    records = LaunchRecord.from_v4_batch(iter(rows))
+
+    assert [r.launch_id for r in records] == ["0", "1", "2"]
+    assert len({r.updated_at for r in records}) == 1
+    assert records[0].updated_at is not None
+    assert records[0].rocket_id is records[2].rocket_id
+    assert records[0].launchpad_id is records[2].launchpad_id
+    assert records[1].to_dynamo_item()["updated_at"] == records[0].updated_at